@@ -2,13 +2,41 @@
 import argparse
 import json
 import os
+import queue
 import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from decimal import Decimal
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import psycopg
-from psycopg.rows import dict_row
+from psycopg import postgres, pq, sql
+from psycopg.rows import tuple_row
+
+STAGING_TABLE = "_stg"
+# Number of fetched batches the source reader may run ahead of the destination writers
+QUEUE_SIZE = 4
+# --auto-batch-size: starting size, ceiling, and how many batches are measured while tuning
+AUTO_BATCH_START = 1000
+AUTO_BATCH_MAX = 10_000
+AUTO_BATCH_SAMPLES = 8
+# libpq TCP keepalives so idle NAT/firewall timeouts don't silently drop multi-hour sessions
+KEEPALIVE_KWARGS: Dict[str, Any] = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+}
+# Destination writers reconnect and replay their open transaction after a connection failure
+MAX_RECONNECTS = 5
+RECONNECT_BASE_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+# --workers splits the source by ranges of these --id-column types
+UUID_OID = postgres.types["uuid"].oid
+INTEGER_OIDS = {postgres.types[name].oid for name in ("int2", "int4", "int8")}
 
 
 @dataclass
@@ -16,6 +44,86 @@ class DbConfig:
     dsn: str
 
 
+@dataclass
+class TableInfo:
+    columns: List[str]
+    primary_key: List[str]
+    # Column name -> type oid
+    types: Dict[str, int]
+
+
+@dataclass
+class UpsertSql:
+    create_staging: sql.Composed
+    copy: sql.Composed
+    copy_binary: sql.Composed
+    merge: sql.Composed
+    truncate_staging: sql.Composed
+    insert_values: sql.Composed
+
+
+@dataclass
+class MigrationPlan:
+    dest_dsn: str
+    dest_settings: Dict[str, str]
+    statements: UpsertSql
+    method: str
+    commit_every: int
+    dry_run: bool
+
+
+class BatchSizer:
+    """
+    Supplies the insert batch size to the source reader. When auto-tuning, the size doubles
+    after each measured batch whose rows/sec beat the best so far by more than 10%, and is
+    frozen once throughput plateaus, the ceiling is hit, or AUTO_BATCH_SAMPLES were taken.
+    """
+
+    def __init__(self, size: int, auto: bool) -> None:
+        self.size = size
+        self.auto = auto
+        self._best_rate = 0.0
+        self._samples = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        return self.size
+
+    def record(self, rows: int, elapsed: float) -> None:
+        if not self.auto or elapsed <= 0:
+            return
+        with self._lock:
+            # Ignore batches cut before the last resize and the final partial batch
+            if self._samples >= AUTO_BATCH_SAMPLES or rows != self.size:
+                return
+            self._samples += 1
+            rate = rows / elapsed
+            if rate > self._best_rate * 1.1 and self.size < AUTO_BATCH_MAX:
+                self.size = min(self.size * 2, AUTO_BATCH_MAX)
+            else:
+                self._samples = AUTO_BATCH_SAMPLES
+            self._best_rate = max(self._best_rate, rate)
+
+
+class Progress:
+    """
+    Row counters shared by the writer threads.
+    """
+
+    def __init__(self, verbose: bool = True) -> None:
+        self.seen = 0
+        self.migrated = 0
+        self.verbose = verbose
+        self._lock = threading.Lock()
+
+    def add(self, seen: int, migrated: int) -> None:
+        with self._lock:
+            self.seen += seen
+            self.migrated += migrated
+            if self.verbose:
+                print(f"Migrated {self.migrated} rows...", end="\r", flush=True)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Migrate rows from a source Postgres table to a destination Postgres table, preserving UUIDs and best-effort field mapping."
@@ -62,8 +170,28 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=int(os.environ.get("BATCH_SIZE", "500")),
-        help="Number of rows to migrate per batch. Default: 500",
+        default=int(os.environ.get("BATCH_SIZE", "5000")),
+        help="Number of rows to migrate per batch. Default: 5000",
+    )
+    parser.add_argument(
+        "--auto-batch-size",
+        action="store_true",
+        help=(
+            f"Tune the batch size from measured throughput instead of using --batch-size: start at "
+            f"{AUTO_BATCH_START} rows and double while rows/sec improves, up to {AUTO_BATCH_MAX}."
+        ),
+    )
+    parser.add_argument(
+        "--fetch-size",
+        type=int,
+        default=int(os.environ.get("FETCH_SIZE", "10000")),
+        help="Number of rows the source server-side cursor prefetches per round-trip. Default: 10000",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=int(os.environ.get("COMMIT_EVERY", "20")),
+        help="Commit the destination transaction after this many batches. Default: 20",
     )
     parser.add_argument(
         "--where",
@@ -74,7 +202,56 @@ def parse_args() -> argparse.Namespace:
         "--on-conflict",
         choices=["skip", "update", "error"],
         default=os.environ.get("ON_CONFLICT", "skip"),
-        help="Conflict behavior on duplicate id. 'skip' uses DO NOTHING, 'update' upserts, 'error' raises. Default: skip",
+        help=(
+            "Conflict behavior on duplicate id. 'skip' leaves existing rows alone, 'update' upserts "
+            "(MERGE, PostgreSQL 15+, with the copy method), 'error' raises. Default: skip"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("WORKERS", "1")),
+        help=(
+            "Number of worker processes. Each migrates a disjoint key range of the uuid or integer "
+            "--id-column with its own connections and writer threads. Default: 1"
+        ),
+    )
+    parser.add_argument(
+        "--writers",
+        type=int,
+        default=int(os.environ.get("WRITERS", "4")),
+        help="Number of concurrent destination connections writing batches. Default: 4",
+    )
+    parser.add_argument(
+        "--insert-method",
+        choices=["copy", "values"],
+        default=os.environ.get("INSERT_METHOD", "copy"),
+        help=(
+            "How batches are written. 'copy' streams into a temp staging table and merges with one "
+            "INSERT ... SELECT or MERGE; 'values' pipelines one INSERT ... VALUES per row. Default: copy"
+        ),
+    )
+    parser.add_argument(
+        "--fast-copy",
+        action="store_true",
+        help=(
+            "Stream COPY ... TO STDOUT from the source straight into COPY ... FROM STDIN on the destination "
+            "in binary format, in a single transaction. Mapped column types must be binary-compatible. "
+            "Ignores --batch-size, --writers and --insert-method; --dry-run uses the batched path."
+        ),
+    )
+    parser.add_argument(
+        "--disable-triggers",
+        action="store_true",
+        help=(
+            "Set session_replication_role = replica on destination sessions so triggers and FK checks are "
+            "skipped. Requires superuser; only use when the source data is known to be consistent."
+        ),
+    )
+    parser.add_argument(
+        "--work-mem",
+        default=os.environ.get("WORK_MEM"),
+        help="Optional work_mem for destination sessions (e.g. 256MB), used by the staging merge.",
     )
     parser.add_argument(
         "--dry-run",
@@ -109,44 +286,47 @@ def normalize_table_name(table: str) -> Tuple[Optional[str], str]:
     raise ValueError(f"Invalid table name: {table}")
 
 
-def fetch_columns(conn: psycopg.Connection, table: str) -> List[str]:
-    schema, relname = normalize_table_name(table)
-    if schema is None:
-        schema = "public"
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            select column_name
-            from information_schema.columns
-            where table_schema = %s and table_name = %s
-            order by ordinal_position
-            """,
-            (schema, relname),
-        )
-        rows = cur.fetchall()
-    return [r[0] for r in rows]
+_TABLE_INFO_CACHE: Dict[Tuple[str, str, str], TableInfo] = {}
 
 
-def fetch_primary_key_columns(conn: psycopg.Connection, table: str) -> List[str]:
+def describe_table(conn: psycopg.Connection, table: str) -> TableInfo:
+    """
+    Returns the ordered column list, primary key columns and column type oids of a table in
+    one catalog query.
+    Results are memoized per (dsn, schema, table).
+    """
     schema, relname = normalize_table_name(table)
     if schema is None:
         schema = "public"
+    key = (conn.info.dsn, schema, relname)
+    cached = _TABLE_INFO_CACHE.get(key)
+    if cached is not None:
+        return cached
+    # pg_catalog directly: information_schema views join many catalogs and are slow
     with conn.cursor() as cur:
         cur.execute(
             """
-            select a.attname as column_name
-            from pg_index i
-            join pg_class c on c.oid = i.indrelid
+            select a.attname, coalesce(a.attnum = any(i.indkey), false) as is_pk, a.atttypid::int
+            from pg_attribute a
+            join pg_class c on c.oid = a.attrelid
             join pg_namespace n on n.oid = c.relnamespace
-            join pg_attribute a on a.attrelid = c.oid and a.attnum = any(i.indkey)
-            where i.indisprimary = true
-              and n.nspname = %s
+            left join pg_index i on i.indrelid = c.oid and i.indisprimary
+            where n.nspname = %s
               and c.relname = %s
+              and a.attnum > 0
+              and not a.attisdropped
+            order by a.attnum
             """,
             (schema, relname),
         )
         rows = cur.fetchall()
-    return [r[0] for r in rows]
+    info = TableInfo(
+        columns=[r[0] for r in rows],
+        primary_key=[r[0] for r in rows if r[1]],
+        types={r[0]: r[2] for r in rows},
+    )
+    _TABLE_INFO_CACHE[key] = info
+    return info
 
 
 def build_mapping(
@@ -182,98 +362,487 @@ def build_mapping(
     return mapping
 
 
-def chunked(iterable: Iterable[Any], size: int) -> Iterable[List[Any]]:
-    batch: List[Any] = []
-    for item in iterable:
-        batch.append(item)
-        if len(batch) >= size:
-            yield batch
-            batch = []
-    if batch:
-        yield batch
+def chunked(iterable: Iterable[Any], size: Union[int, Callable[[], int]]) -> Iterator[List[Any]]:
+    """
+    Splits an iterable into lists of `size` items; `size` may be a callable read before each chunk.
+    """
+    it = iter(iterable)
+    next_size = size if callable(size) else lambda: size
+    # islice does the per-item counting in C; the sentinel [] ends iteration
+    return iter(lambda: list(islice(it, next_size())), [])
 
 
-def select_source_rows(
-    conn: psycopg.Connection,
+def table_identifier(table: str) -> sql.Identifier:
+    schema, relname = normalize_table_name(table)
+    return sql.Identifier(schema, relname) if schema else sql.Identifier(relname)
+
+
+def column_list(columns: Sequence[str]) -> sql.Composed:
+    return sql.SQL(", ").join(map(sql.Identifier, columns))
+
+
+def build_source_select(
     table: str,
     columns: Sequence[str],
-    where: Optional[str],
-    batch_size: int,
-) -> Iterable[List[Dict[str, Any]]]:
-    col_list = ", ".join(f'"{c}"' for c in columns)
-    base_sql = f"select {col_list} from {table}"
+    where: Optional[Union[str, sql.Composable]],
+    text_columns: Iterable[str] = (),
+) -> sql.Composed:
+    cast = set(text_columns)
+    cols = sql.SQL(", ").join(
+        sql.SQL("{col}::text as {col}").format(col=sql.Identifier(c)) if c in cast else sql.Identifier(c)
+        for c in columns
+    )
+    query = sql.SQL("select {cols} from {tbl}").format(cols=cols, tbl=table_identifier(table))
     if where:
-        base_sql += f" where {where}"
-    # Server-side cursor to avoid loading all rows into memory
-    with conn.cursor(name="src_cursor", row_factory=dict_row) as cur:
-        cur.itersize = batch_size
-        cur.execute(base_sql)
-        while True:
-            rows = cur.fetchmany(batch_size)
-            if not rows:
-                break
-            yield rows
+        # --where is operator-supplied SQL and is intentionally passed through verbatim
+        query += sql.SQL(" where ") + (sql.SQL(where) if isinstance(where, str) else where)
+    return query
 
 
-def upsert_rows(
+def select_source_rows(
     conn: psycopg.Connection,
+    table: str,
+    columns: Sequence[str],
+    column_types: Dict[str, int],
+    where: Optional[Union[str, sql.Composable]],
+    batch_size: Union[int, Callable[[], int]],
+    fetch_size: int,
+) -> Iterable[List[Tuple[Any, ...]]]:
+    # Server-side cursor to avoid loading all rows into memory; the prefetch size is
+    # independent of the insert batch size. Binary results skip text encoding of UUID,
+    # timestamp and numeric columns on the server and parsing them on the client.
+    # Types psycopg has no binary loader for (enums, tsvector, ...) would come back as raw
+    # bytes and be written as bytea, so those columns are selected as text instead.
+    text_columns = [
+        c for c in columns if conn.adapters.get_loader(column_types[c], pq.Format.BINARY) is None
+    ]
+    with conn.cursor(name="src_cursor", binary=True, row_factory=tuple_row) as cur:
+        cur.itersize = fetch_size
+        cur.execute(build_source_select(table, columns, where, text_columns))
+        yield from chunked(cur, batch_size)
+
+
+def make_upsert_sql(
     dest_table: str,
-    mapping: Dict[str, str],
-    rows: Sequence[Dict[str, Any]],
+    dst_cols: Sequence[str],
     on_conflict: str,
     conflict_target: Sequence[str],
-    dry_run: bool,
-) -> Tuple[int, int]:
+) -> UpsertSql:
     """
-    Insert or upsert rows. Returns (inserted_count, skipped_or_updated_count).
+    Composes the statements used by upsert_rows and fast_copy_rows. Built once per migration
+    run; identifiers are quoted by psycopg rather than interpolated into strings.
     """
-    if not rows:
-        return (0, 0)
-    src_cols = list(mapping.keys())
-    dst_cols = [mapping[s] for s in src_cols]
-    dst_cols_sql = ", ".join(f'"{c}"' for c in dst_cols)
-    placeholders = ", ".join(["%s"] * len(dst_cols))
+    tbl = table_identifier(dest_table)
+    stg = sql.Identifier(STAGING_TABLE)
+    cols = column_list(dst_cols)
+    target = column_list(conflict_target)
+    staged_cols = sql.SQL(", ").join(sql.SQL("s.{}").format(sql.Identifier(c)) for c in dst_cols)
+    join_on = sql.SQL(" and ").join(
+        sql.SQL("d.{col} = s.{col}").format(col=sql.Identifier(c)) for c in conflict_target
+    )
+    # Update all non-conflict columns
+    update_cols = [c for c in dst_cols if c not in conflict_target]
 
     if on_conflict == "skip":
-        conflict_sql = f"on conflict ({', '.join(conflict_target)}) do nothing"
-        returning = ""
+        conflict_sql: sql.Composable = sql.SQL(" on conflict ({}) do nothing").format(target)
+        # Anti-join instead of ON CONFLICT: skips the speculative insert and index probe per row
+        merge = sql.SQL(
+            "insert into {tbl} ({cols}) select {staged} from {stg} s "
+            "where not exists (select 1 from {tbl} d where {join_on})"
+        ).format(tbl=tbl, cols=cols, staged=staged_cols, stg=stg, join_on=join_on)
     elif on_conflict == "update":
-        # Update all non-conflict columns
-        update_assignments = ", ".join(
-            f'"{c}" = EXCLUDED."{c}"' for c in dst_cols if c not in conflict_target
+        conflict_sql = sql.SQL(" on conflict ({}) do update set {}").format(
+            target,
+            sql.SQL(", ").join(
+                sql.SQL("{col} = excluded.{col}").format(col=sql.Identifier(c)) for c in update_cols
+            ),
         )
-        conflict_sql = (
-            f"on conflict ({', '.join(conflict_target)}) do update set {update_assignments}"
+        # MERGE (PostgreSQL 15+) applies the whole staged batch as one set-based update/insert
+        if update_cols:
+            when_matched: sql.Composable = sql.SQL("update set {}").format(
+                sql.SQL(", ").join(
+                    sql.SQL("{col} = s.{col}").format(col=sql.Identifier(c)) for c in update_cols
+                )
+            )
+        else:
+            when_matched = sql.SQL("do nothing")
+        merge = sql.SQL(
+            "merge into {tbl} d using {stg} s on {join_on} "
+            "when matched then {when_matched} "
+            "when not matched then insert ({cols}) values ({staged})"
+        ).format(
+            tbl=tbl, stg=stg, join_on=join_on, when_matched=when_matched, cols=cols, staged=staged_cols
         )
-        returning = ""
     else:
-        conflict_sql = ""
-        returning = ""
+        conflict_sql = sql.SQL("")
+        merge = sql.SQL("insert into {tbl} ({cols}) select {cols} from {stg}").format(
+            tbl=tbl, cols=cols, stg=stg
+        )
 
-    sql = f"""
-        insert into {dest_table} ({dst_cols_sql})
-        values ({placeholders})
-        {conflict_sql}
-        {returning}
-    """
-    values: List[Tuple[Any, ...]] = []
-    for r in rows:
-        values.append(tuple(_adapt_value(r.get(s)) for s in src_cols))
+    return UpsertSql(
+        # Only the mapped columns are staged: unmapped defaults (e.g. serial nextval) are not
+        # evaluated per staged row, and unmapped identity columns cannot reject the COPY
+        create_staging=sql.SQL(
+            "create temp table if not exists {stg} on commit drop as select {cols} from {tbl} with no data"
+        ).format(stg=stg, cols=cols, tbl=tbl),
+        # Text format: the server casts into the destination types (e.g. varchar -> enum)
+        copy=sql.SQL("copy {stg} ({cols}) from stdin").format(stg=stg, cols=cols),
+        copy_binary=sql.SQL("copy {stg} ({cols}) from stdin with (format binary)").format(
+            stg=stg, cols=cols
+        ),
+        merge=merge,
+        truncate_staging=sql.SQL("truncate {}").format(stg),
+        insert_values=sql.SQL("insert into {tbl} ({cols}) values ({ph})").format(
+            tbl=tbl, cols=cols, ph=sql.SQL(", ").join(sql.Placeholder() * len(dst_cols))
+        )
+        + conflict_sql,
+    )
 
-    if dry_run:
+
+def upsert_rows(
+    cur: psycopg.Cursor,
+    statements: UpsertSql,
+    rows: Sequence[Tuple[Any, ...]],
+    method: str,
+    dry_run: bool,
+) -> Tuple[int, int]:
+    """
+    Insert or upsert rows. With method 'copy' the batch is streamed into a temporary staging
+    table and moved into the destination with a single INSERT ... SELECT or MERGE; with 'values' the
+    per-row INSERTs are sent in pipeline mode so the batch costs one round-trip.
+    The cursor is reused across batches so its connection's prepared statements are too.
+    Returns (inserted_count, skipped_or_updated_count).
+    """
+    # Rows are tuples already in mapping order (see select_source_rows), so they pass through as-is
+    if not rows or dry_run:
         return (0, 0)
 
+    if method == "values":
+        with cur.connection.pipeline():
+            cur.executemany(statements.insert_values, rows)
+        return (len(rows), 0)
+
+    # Temp tables are not WAL-logged; the table lives until the next commit and is emptied
+    # after each merge since several batches may share one transaction
+    cur.execute(statements.create_staging, prepare=False)
+    with cur.copy(statements.copy) as copy:
+        for row in rows:
+            copy.write_row(row)
+    cur.execute(statements.merge)
+    inserted = max(cur.rowcount, 0)
+    cur.execute(statements.truncate_staging, prepare=False)
+    return (inserted, len(rows) - inserted)
+
+
+def fast_copy_rows(
+    src_conn: psycopg.Connection,
+    dst_conn: psycopg.Connection,
+    select_sql: sql.Composed,
+    statements: UpsertSql,
+) -> Tuple[int, int]:
+    """
+    Pipes the source SELECT through binary COPY straight into the staging table and merges it
+    with a single INSERT ... SELECT or MERGE, so rows never become Python objects.
+    Returns (inserted_count, skipped_or_updated_count).
+    """
+    copy_out = sql.SQL("copy ({}) to stdout with (format binary)").format(select_sql)
+    with src_conn.cursor() as src_cur, dst_conn.cursor() as dst_cur:
+        dst_cur.execute(statements.create_staging)
+        with src_cur.copy(copy_out) as reader:
+            with dst_cur.copy(statements.copy_binary) as writer:
+                for data in reader:
+                    writer.write(data)
+        staged = max(dst_cur.rowcount, 0)
+        dst_cur.execute(statements.merge)
+        inserted = max(dst_cur.rowcount, 0)
+    return (inserted, staged - inserted)
+
+
+def _put_until_stopped(q: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def consume_batches(
+    q: "queue.Queue[Any]", stop: threading.Event
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Yields batches until the None sentinel is received or the stop event is set.
+    """
+    while not stop.is_set():
+        try:
+            item = q.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if item is None:
+            return
+        yield item
+
+
+def dest_session_settings(args: argparse.Namespace) -> Dict[str, str]:
+    # A one-shot migration can be re-run, so commits need not wait for the WAL flush
+    settings = {"synchronous_commit": "off", "statement_timeout": "0"}
+    if args.disable_triggers:
+        settings["session_replication_role"] = "replica"
+    if args.work_mem:
+        settings["work_mem"] = args.work_mem
+    return settings
+
+
+def connect_source(dsn: str) -> psycopg.Connection:
+    # Long-running source scans must not be cut off by a server-side statement_timeout
+    return connect_with_settings(dsn, {"statement_timeout": "0"})
+
+
+def connect_with_settings(dsn: str, settings: Dict[str, str], **kwargs: Any) -> psycopg.Connection:
+    """
+    Opens a connection with TCP keepalives and the given session settings applied and committed.
+    """
+    conn = psycopg.connect(dsn, **KEEPALIVE_KWARGS, **kwargs)
+    try:
+        conn.autocommit = False
+        for name, value in settings.items():
+            conn.execute("select set_config(%s, %s, false)", (name, value), prepare=False)
+        conn.commit()
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+class DestWriter:
+    """
+    A writer thread's destination session. Batches written in the open transaction are kept
+    until it commits; if the connection is lost before the commit is sent, the writer
+    reconnects with exponential backoff and replays them. A connection lost during COMMIT
+    is not retried, since the server may already have committed the transaction.
+    """
+
+    def __init__(self, plan: MigrationPlan, progress: Progress, sizer: BatchSizer) -> None:
+        self.plan = plan
+        self.progress = progress
+        self.sizer = sizer
+        self.conn: Optional[psycopg.Connection] = None
+        self.cur: Optional[psycopg.Cursor] = None
+        # (batch, inserted_count) for every batch in the open transaction
+        self.pending: List[Tuple[List[Tuple[Any, ...]], int]] = []
+
+    def write(self, batch: List[Tuple[Any, ...]]) -> None:
+        self._run([batch], commit=len(self.pending) + 1 >= self.plan.commit_every)
+
+    def flush(self) -> None:
+        self._run([], commit=True)
+
+    def close(self) -> None:
+        # Closing without commit rolls back whatever is still open
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+        self.cur = None
+
+    def _connect(self) -> psycopg.Cursor:
+        # prepare_threshold=0 makes psycopg prepare every statement on first use, so the upsert
+        # is parsed and planned once per connection instead of once per batch
+        self.conn = connect_with_settings(self.plan.dest_dsn, self.plan.dest_settings, prepare_threshold=0)
+        self.cur = self.conn.cursor()
+        return self.cur
+
+    def _run(self, batches: List[List[Tuple[Any, ...]]], commit: bool) -> None:
+        todo = list(batches)
+        failures = 0
+        while True:
+            try:
+                cur = self.cur if self.cur is not None else self._connect()
+                while todo:
+                    started = time.perf_counter()
+                    inserted, _ = upsert_rows(
+                        cur=cur,
+                        statements=self.plan.statements,
+                        rows=todo[0],
+                        method=self.plan.method,
+                        dry_run=self.plan.dry_run,
+                    )
+                    self.sizer.record(len(todo[0]), time.perf_counter() - started)
+                    self.progress.add(len(todo[0]), inserted)
+                    self.pending.append((todo.pop(0), inserted))
+                break
+            except psycopg.OperationalError as exc:
+                # Only a lost connection is retried; query errors (cancellations, timeouts) surface
+                if self.conn is not None and not self.conn.broken:
+                    raise
+                failures += 1
+                if failures > MAX_RECONNECTS:
+                    raise
+                # The open transaction died with the connection: un-count and replay its batches
+                for batch, inserted in self.pending:
+                    self.progress.add(-len(batch), -inserted)
+                todo = [batch for batch, _ in self.pending] + todo
+                self.pending.clear()
+                self.close()
+                delay = min(RECONNECT_BASE_DELAY * 2 ** (failures - 1), RECONNECT_MAX_DELAY)
+                print(
+                    f"\nDestination connection failed ({exc}); reconnecting in {delay:.0f}s "
+                    f"(attempt {failures}/{MAX_RECONNECTS})",
+                    file=sys.stderr,
+                )
+                time.sleep(delay)
+
+        if not commit:
+            return
+        if not self.plan.dry_run:
+            try:
+                cur.connection.commit()
+            except psycopg.OperationalError as exc:
+                # The COMMIT may have reached the server; replaying could duplicate its rows
+                raise RuntimeError(
+                    f"Destination connection failed during commit of {len(self.pending)} batches; "
+                    "the transaction may or may not have been applied. Re-run with --on-conflict skip."
+                ) from exc
+        self.pending.clear()
+
+
+def write_batches(
+    plan: MigrationPlan,
+    q: "queue.Queue[Any]",
+    abort: threading.Event,
+    progress: Progress,
+    sizer: BatchSizer,
+) -> None:
+    """
+    Writer thread body: upserts queued batches on a dedicated destination connection,
+    committing every plan.commit_every batches. Sets abort on failure so the reader and the
+    other writers stop early; an aborted writer rolls back its open transaction.
+    """
+    writer = DestWriter(plan, progress, sizer)
+    try:
+        for batch in consume_batches(q, abort):
+            writer.write(batch)
+        if not abort.is_set():
+            writer.flush()
+    except BaseException:
+        abort.set()
+        raise
+    finally:
+        writer.close()
+
+
+def shard_bounds(
+    conn: psycopg.Connection, table: str, id_column: str, type_oid: int, where: Optional[str], shards: int
+) -> List[Any]:
+    """
+    Returns the `shards - 1` ascending split points of id_column. UUID keys split the whole
+    keyspace evenly, since random (v4) UUIDs are spread evenly over it; integer keys split the
+    min/max range of the rows matching `where`.
+    """
+    if type_oid == UUID_OID:
+        return [uuid.UUID(int=i * 2**128 // shards) for i in range(1, shards)]
+    query = sql.SQL("select min({col}), max({col}) from {tbl}").format(
+        col=sql.Identifier(id_column), tbl=table_identifier(table)
+    )
+    if where:
+        query += sql.SQL(" where ") + sql.SQL(where)
     with conn.cursor() as cur:
-        cur.executemany(sql, values)
-    return (len(values), 0)
+        cur.execute(query)
+        lo, hi = cur.fetchone() or (None, None)
+    conn.commit()
+    if lo is None:
+        lo = hi = 0
+    return [lo + i * (hi - lo + 1) // shards for i in range(1, shards)]
 
 
-def _adapt_value(value: Any) -> Any:
-    # psycopg3 adapts Decimal, UUID, datetime, etc., automatically.
-    # Keep as-is; add minimal normalization when helpful.
-    if isinstance(value, Decimal):
-        return value  # Do not coerce to float to preserve precision
-    return value
+def shard_where(where: Optional[str], id_column: str, lo: Any, hi: Any) -> sql.Composed:
+    """
+    Restricts the source WHERE clause to the half-open range [lo, hi) of id_column, so each
+    worker reads only its own slice through the primary key index. A None bound is open.
+    """
+    col = sql.Identifier(id_column)
+    bounds = []
+    if lo is not None:
+        bounds.append(sql.SQL("{} >= {}").format(col, sql.Literal(lo)))
+    if hi is not None:
+        bounds.append(sql.SQL("{} < {}").format(col, sql.Literal(hi)))
+    clause = sql.SQL(" and ").join(bounds)
+    if where:
+        return sql.SQL("({}) and {}").format(sql.SQL(where), clause)
+    return clause
+
+
+def run_migration(
+    args: argparse.Namespace,
+    dest_table: str,
+    mapping: Dict[str, str],
+    conflict_target: List[str],
+    where: Optional[Union[str, sql.Composable]],
+    show_progress: bool,
+    src_conn: Optional[psycopg.Connection] = None,
+) -> Tuple[int, int]:
+    """
+    Migrates the source rows matching `where`. Runs in-process, reusing the introspection
+    source connection, or as a --workers shard on a fresh one. Returns (rows_read, rows_migrated).
+    """
+    if src_conn is None:
+        with connect_source(args.source_dsn) as conn:
+            return run_migration(args, dest_table, mapping, conflict_target, where, show_progress, conn)
+
+    statements = make_upsert_sql(dest_table, list(mapping.values()), args.on_conflict, conflict_target)
+    if args.fast_copy and not args.dry_run:
+        with connect_with_settings(args.dest_dsn, dest_session_settings(args)) as dst_conn:
+            inserted, skipped = fast_copy_rows(
+                src_conn=src_conn,
+                dst_conn=dst_conn,
+                select_sql=build_source_select(args.source_table, list(mapping.keys()), where),
+                statements=statements,
+            )
+            dst_conn.commit()
+        return (inserted + skipped, inserted)
+
+    plan = MigrationPlan(
+        dest_dsn=args.dest_dsn,
+        dest_settings=dest_session_settings(args),
+        statements=statements,
+        method=args.insert_method,
+        commit_every=args.commit_every,
+        dry_run=args.dry_run,
+    )
+    progress = Progress(show_progress)
+    if args.auto_batch_size:
+        sizer = BatchSizer(AUTO_BATCH_START, auto=True)
+    else:
+        sizer = BatchSizer(args.batch_size, auto=False)
+    # The source is read on this thread while writer threads upsert concurrently, each on
+    # its own destination connection (psycopg connections are not shared across threads).
+    batch_queue: "queue.Queue[Any]" = queue.Queue(maxsize=QUEUE_SIZE)
+    abort = threading.Event()
+    with ThreadPoolExecutor(max_workers=args.writers, thread_name_prefix="dest-writer") as pool:
+        writers = [
+            pool.submit(write_batches, plan, batch_queue, abort, progress, sizer)
+            for _ in range(args.writers)
+        ]
+        try:
+            for batch in select_source_rows(
+                conn=src_conn,
+                table=args.source_table,
+                columns=list(mapping.keys()),
+                column_types=describe_table(src_conn, args.source_table).types,
+                where=where,
+                batch_size=sizer.current,
+                fetch_size=args.fetch_size,
+            ):
+                if not _put_until_stopped(batch_queue, batch, abort):
+                    break
+            for _ in writers:
+                _put_until_stopped(batch_queue, None, abort)
+        except BaseException:
+            abort.set()
+            raise
+        for writer in writers:
+            writer.result()
+    return (progress.seen, progress.migrated)
 
 
 def main() -> None:
@@ -283,6 +852,16 @@ def main() -> None:
         raise SystemExit("Missing --source-dsn or SOURCE_DB_DSN")
     if not args.dest_dsn:
         raise SystemExit("Missing --dest-dsn or DEST_DB_DSN")
+    if args.batch_size < 1:
+        raise SystemExit("--batch-size must be at least 1")
+    if args.fetch_size < 1:
+        raise SystemExit("--fetch-size must be at least 1")
+    if args.commit_every < 1:
+        raise SystemExit("--commit-every must be at least 1")
+    if args.writers < 1:
+        raise SystemExit("--writers must be at least 1")
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1")
 
     dest_table = args.dest_table or args.source_table
     exclude_columns = [c.strip() for c in args.exclude_columns.split(",")] if args.exclude_columns else []
@@ -293,17 +872,25 @@ def main() -> None:
     print(f"Excluding source columns: {exclude_columns}")
     if explicit_map:
         print(f"Using explicit column map for: {list(explicit_map.keys())}")
-    print(f"Batch size: {args.batch_size} | On conflict: {args.on_conflict} | Dry-run: {args.dry_run}")
+    batch_size_label = "auto" if args.auto_batch_size else args.batch_size
+    print(
+        f"Batch size: {batch_size_label} | Commit every: {args.commit_every} batches | "
+        f"Workers: {args.workers} | Writers: {args.writers} | "
+        f"Insert method: {args.insert_method} | On conflict: {args.on_conflict} | Dry-run: {args.dry_run}"
+    )
     if args.where:
         print(f"WHERE: {args.where}")
 
-    with psycopg.connect(args.source_dsn) as src_conn, psycopg.connect(args.dest_dsn) as dst_conn:
-        src_conn.autocommit = False
-        dst_conn.autocommit = False
-
-        src_columns = fetch_columns(src_conn, args.source_table)
-        dst_columns = fetch_columns(dst_conn, dest_table)
-        pk_columns = fetch_primary_key_columns(dst_conn, dest_table)
+    # The source connection opened for introspection also runs the scan when --workers is 1;
+    # the destination is only needed here, since writers open their own sessions
+    with connect_source(args.source_dsn) as src_conn:
+        src_info = describe_table(src_conn, args.source_table)
+        src_columns = src_info.columns
+        src_conn.commit()
+        with psycopg.connect(args.dest_dsn, **KEEPALIVE_KWARGS) as dst_conn:
+            dst_info = describe_table(dst_conn, dest_table)
+        dst_columns = dst_info.columns
+        pk_columns = dst_info.primary_key
         conflict_target = [args.id_column] if args.id_column else (pk_columns or ["id"])
 
         mapping = build_mapping(
@@ -326,38 +913,39 @@ def main() -> None:
         if missing_in_dest:
             print(f"Warning: mapped columns not found in destination: {missing_in_dest}", file=sys.stderr)
 
-        migrated = 0
-        would_migrate = 0
-        for batch in select_source_rows(
-            conn=src_conn,
-            table=args.source_table,
-            columns=list(mapping.keys()),
-            where=args.where,
-            batch_size=args.batch_size,
-        ):
-            would_migrate += len(batch)
-            inserted, _ = upsert_rows(
-                conn=dst_conn,
-                dest_table=dest_table,
-                mapping=mapping,
-                rows=batch,
-                on_conflict=args.on_conflict,
-                conflict_target=conflict_target,
-                dry_run=args.dry_run,
+        if args.workers > 1:
+            key_type = src_info.types.get(args.id_column)
+            if key_type != UUID_OID and key_type not in INTEGER_OIDS:
+                raise SystemExit(f"--workers > 1 requires a uuid or integer --id-column; got {args.id_column!r}")
+            print(f"Splitting source into {args.workers} shards by range of {args.id_column}")
+            splits = shard_bounds(
+                src_conn, args.source_table, args.id_column, key_type, args.where, args.workers
             )
-            migrated += inserted
-            if not args.dry_run:
-                dst_conn.commit()
-            print(f"Migrated {migrated} rows...", end="\r", flush=True)
-
-        print()  # newline after progress
-        if args.dry_run:
-            print(f"Dry-run complete. Would migrate approximately {would_migrate} rows.")
+            edges = [None, *splits, None]
+            shard_wheres = [
+                shard_where(args.where, args.id_column, edges[shard], edges[shard + 1])
+                for shard in range(args.workers)
+            ]
+            seen = migrated = 0
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                futures = [
+                    pool.submit(run_migration, args, dest_table, mapping, conflict_target, where, False)
+                    for where in shard_wheres
+                ]
+                for future in as_completed(futures):
+                    shard_seen, shard_migrated = future.result()
+                    seen += shard_seen
+                    migrated += shard_migrated
+                    print(f"Migrated {migrated} rows...", end="\r", flush=True)
         else:
-            print(f"Done. Migrated {migrated} rows.")
+            seen, migrated = run_migration(args, dest_table, mapping, conflict_target, args.where, True, src_conn)
+
+    print()  # newline after progress
+    if args.dry_run:
+        print(f"Dry-run complete. Would migrate approximately {seen} rows.")
+    else:
+        print(f"Done. Migrated {migrated} rows.")
 
 
 if __name__ == "__main__":
     main()
-
-
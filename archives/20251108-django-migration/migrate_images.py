@@ -1,14 +1,15 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import functools
 import os
 import sys
-import shlex
-import subprocess
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import AsyncIterator, Callable, Optional
 
+import httpx
 import psycopg
-from psycopg.rows import dict_row
+from psycopg.rows import class_row
 
 
 @dataclass
@@ -19,9 +20,17 @@ class ImageRow:
     is_main_image: bool
 
 
+@dataclass
+class Stats:
+    total: int = 0
+    downloaded: int = 0
+    uploaded: int = 0
+    skipped_download: int = 0
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Migrate images: download from existing deployment via curl and upload to production image-create endpoint via curl."
+        description="Migrate images: download from existing deployment and upload to production image-create endpoint over persistent HTTP/2 connections."
     )
     parser.add_argument(
         "--source-dsn",
@@ -52,7 +61,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--save-dir",
         default=os.environ.get("SAVE_DIR", "images"),
-        help="Local subdirectory (relative to scripts/) to store downloaded images. Default: images",
+        help="Local subdirectory (relative to scripts/) holding previously downloaded images, read with --skip-download. Default: images",
     )
     parser.add_argument(
         "--upload-prefix",
@@ -67,7 +76,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--cookie",
         default=os.environ.get("COOKIE"),
-        help='Cookie header value containing access token, e.g. "access_token=...". Will be sent as: -H "Cookie: <value>".',
+        help='Cookie header value containing access token, e.g. "access_token=...". Will be sent as the Cookie header on uploads.',
     )
     parser.add_argument(
         "--upload-field-file",
@@ -80,19 +89,26 @@ def parse_args() -> argparse.Namespace:
         help="Form field name for main-image flag. Default: is_main_image",
     )
     parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="If set, print curl commands but do not execute them.",
+        "--download-concurrency",
+        type=int,
+        default=int(os.environ.get("DOWNLOAD_CONCURRENCY", "16")),
+        help="Maximum number of downloads in flight. Default: 16",
     )
     parser.add_argument(
-        "--skip-download",
+        "--upload-concurrency",
+        type=int,
+        default=int(os.environ.get("UPLOAD_CONCURRENCY", "8")),
+        help="Maximum number of uploads in flight. Default: 8",
+    )
+    parser.add_argument(
+        "--dry-run",
         action="store_true",
-        help="If set, skip downloading and assume files already exist in --save-dir with same relative paths.",
+        help="If set, print the requests that would be made but do not send them.",
     )
     parser.add_argument(
-        "--cleanup",
+        "--skip-download",
         action="store_true",
-        help="Delete downloaded files after successful upload.",
+        help="If set, upload files that already exist in --save-dir (same relative paths) instead of downloading them.",
     )
     return parser.parse_args()
 
@@ -106,22 +122,33 @@ def ensure_prereqs(args: argparse.Namespace) -> None:
         raise SystemExit("Provide --upload-prefix, or --upload-url containing '{artwork_id}'.")
     if not args.cookie:
         raise SystemExit("Missing --cookie or COOKIE (needed for authenticated upload).")
+    if args.download_concurrency < 1:
+        raise SystemExit("--download-concurrency must be at least 1")
+    if args.upload_concurrency < 1:
+        raise SystemExit("--upload-concurrency must be at least 1")
 
 
 def join_url(prefix: str, path: str) -> str:
     return prefix.rstrip("/") + "/" + path.lstrip("/")
 
 
+def read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
 def abs_scripts_path(*parts: str) -> str:
     here = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(here, *parts)
 
 
-def query_images(
-    conn: psycopg.Connection, table: str, where: Optional[str], limit: int
-) -> Iterable[ImageRow]:
+async def query_images(
+    conn: psycopg.AsyncConnection, table: str, where: Optional[str], limit: int
+) -> AsyncIterator[ImageRow]:
+    # Casts happen server-side so rows map straight onto ImageRow without per-field conversion
     sql = f"""
-        select id, artwork_id, image as image_path, is_main_image
+        select id, artwork_id::text as artwork_id, image::text as image_path,
+               coalesce(is_main_image, false) as is_main_image
         from {table}
     """
     if where:
@@ -129,131 +156,198 @@ def query_images(
     sql += " order by id"
     if limit and limit > 0:
         sql += f" limit {int(limit)}"
-    with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql)
-        for r in cur:
-            yield ImageRow(
-                id=r["id"],
-                artwork_id=str(r["artwork_id"]),
-                image_path=str(r["image_path"]),
-                is_main_image=bool(r["is_main_image"]),
-            )
+    async with conn.cursor(row_factory=class_row(ImageRow)) as cur:
+        await cur.execute(sql)
+        async for row in cur:
+            yield row
 
 
-def run_curl(args_list: List[str], dry_run: bool) -> Tuple[int, str, str]:
+async def download_image(client: httpx.AsyncClient, fetch_url: str, dry_run: bool) -> bytes:
     if dry_run:
-        print("$ " + " ".join(shlex.quote(a) for a in args_list))
-        return (0, "", "")
-    proc = subprocess.run(args_list, capture_output=True, text=True)
-    return (proc.returncode, proc.stdout, proc.stderr)
-
-
-def download_image(fetch_url: str, dest_path: str, dry_run: bool) -> None:
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    cmd = ["curl", "-sS", "-fL", fetch_url, "-o", dest_path]
-    code, out, err = run_curl(cmd, dry_run)
-    if not dry_run and code != 0:
-        raise RuntimeError(f"Download failed ({code}) for {fetch_url}: {err.strip() or out.strip()}")
-
-
-def upload_image(
+        print(f"GET {fetch_url}")
+        return b""
+    try:
+        resp = await client.get(fetch_url)
+        resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"Download failed for {fetch_url}: {exc}") from exc
+    return resp.content
+
+
+async def upload_image(
+    client: httpx.AsyncClient,
     upload_url: str,
-    cookie: str,
     file_field: str,
-    file_path: str,
+    filename: str,
+    content: bytes,
     is_main_field: str,
     is_main: bool,
     dry_run: bool,
 ) -> None:
     is_main_val = "true" if is_main else "false"
-    cmd = [
-        "curl",
-        "-sS",
-        "-fL",
-        "-X",
-        "POST",
-        "-H",
-        f"Cookie: {cookie}",
-        "-F",
-        f"{file_field}=@{file_path}",
-        "-F",
-        f"{is_main_field}={is_main_val}",
-        upload_url,
-    ]
-    code, out, err = run_curl(cmd, dry_run)
-    if not dry_run and code != 0:
-        raise RuntimeError(f"Upload failed ({code}) for {os.path.basename(file_path)}: {err.strip() or out.strip()}")
-
-
-def resolve_upload_url(args: argparse.Namespace, artwork_id: str) -> str:
+    if dry_run:
+        print(f"POST {upload_url} {file_field}=@{filename} {is_main_field}={is_main_val}")
+        return
+    try:
+        resp = await client.post(
+            upload_url,
+            files={file_field: (filename, content)},
+            data={is_main_field: is_main_val},
+        )
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise RuntimeError(
+            f"Upload failed ({exc.response.status_code}) for {filename}: {exc.response.text.strip()}"
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise RuntimeError(f"Upload failed for {filename}: {exc}") from exc
+
+
+def make_upload_url_resolver(args: argparse.Namespace) -> Callable[[str], str]:
+    """
+    Returns a function mapping artwork_id to its upload URL. The prefix or template is resolved
+    once up front, and URLs are cached per artwork since most artworks have several images.
+    """
     if args.upload_prefix:
-        return join_url(args.upload_prefix, f"artworks/{artwork_id}/images")
-    if args.upload_url and "{artwork_id}" in args.upload_url:
-        return args.upload_url.replace("{artwork_id}", artwork_id)
-    # As a last resort, if a plain upload_url was provided, use it (may be incorrect)
-    if args.upload_url:
-        return args.upload_url
-    raise RuntimeError("Unable to resolve upload URL: provide --upload-prefix or --upload-url with '{artwork_id}'.")
+        prefix = args.upload_prefix.rstrip("/") + "/artworks/"
+
+        def resolve(artwork_id: str) -> str:
+            return prefix + artwork_id + "/images"
+
+    elif args.upload_url and "{artwork_id}" in args.upload_url:
+        template = args.upload_url
+
+        def resolve(artwork_id: str) -> str:
+            return template.replace("{artwork_id}", artwork_id)
+
+    elif args.upload_url:
+        # As a last resort, if a plain upload_url was provided, use it (may be incorrect)
+        url = args.upload_url
+
+        def resolve(artwork_id: str) -> str:
+            return url
+
+    else:
+        raise RuntimeError("Unable to resolve upload URL: provide --upload-prefix or --upload-url with '{artwork_id}'.")
+    return functools.lru_cache(maxsize=None)(resolve)
+
+
+async def process_image(
+    args: argparse.Namespace,
+    row: ImageRow,
+    save_root: Optional[str],
+    resolve_upload_url: Callable[[str], str],
+    download_client: httpx.AsyncClient,
+    upload_client: httpx.AsyncClient,
+    download_sem: asyncio.Semaphore,
+    upload_sem: asyncio.Semaphore,
+    stats: Stats,
+) -> None:
+    fetch_url = join_url(args.fetch_prefix, row.image_path)
+    local_path = os.path.join(save_root, row.image_path) if save_root else None
+
+    try:
+        # Image bytes go straight from the download response into the upload body
+        if local_path and os.path.exists(local_path):
+            # Read off the event loop so in-flight transfers keep moving
+            content = await asyncio.to_thread(read_file, local_path)
+            stats.skipped_download += 1
+        else:
+            async with download_sem:
+                content = await download_image(download_client, fetch_url, args.dry_run)
+            stats.downloaded += 1
+
+        dest_url = resolve_upload_url(row.artwork_id)
+        async with upload_sem:
+            await upload_image(
+                client=upload_client,
+                upload_url=dest_url,
+                file_field=args.upload_field_file,
+                filename=os.path.basename(row.image_path),
+                content=content,
+                is_main_field=args.upload_field_is_main,
+                is_main=row.is_main_image,
+                dry_run=args.dry_run,
+            )
+        stats.uploaded += 1
+
+    except Exception as exc:
+        print(f"\nError processing image id={row.id} path='{row.image_path}': {exc}", file=sys.stderr)
+
+    stats.total += 1
+    if stats.total % 10 == 0:
+        print(
+            f"\rProcessed {stats.total} | downloaded {stats.downloaded} | "
+            f"skipped {stats.skipped_download} | uploaded {stats.uploaded}",
+            end="",
+            flush=True,
+        )
+
+
+async def run(args: argparse.Namespace, save_root: Optional[str]) -> Stats:
+    stats = Stats()
+    download_sem = asyncio.Semaphore(args.download_concurrency)
+    upload_sem = asyncio.Semaphore(args.upload_concurrency)
+    resolve_upload_url = make_upload_url_resolver(args)
+    # Enough workers to keep both semaphores saturated; the bounded queue keeps memory flat
+    worker_count = args.download_concurrency + args.upload_concurrency
+    rows: "asyncio.Queue[Optional[ImageRow]]" = asyncio.Queue(maxsize=worker_count * 2)
+
+    # One client per host so TCP/TLS connections are reused across every image
+    download_client = httpx.AsyncClient(http2=True, timeout=60, follow_redirects=True)
+    upload_client = httpx.AsyncClient(
+        http2=True, headers={"Cookie": args.cookie}, timeout=120, follow_redirects=True
+    )
+
+    async def worker() -> None:
+        while True:
+            row = await rows.get()
+            if row is None:
+                return
+            await process_image(
+                args,
+                row,
+                save_root,
+                resolve_upload_url,
+                download_client,
+                upload_client,
+                download_sem,
+                upload_sem,
+                stats,
+            )
+
+    async with download_client, upload_client:
+        async with await psycopg.AsyncConnection.connect(args.source_dsn) as src_conn:
+            workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+            try:
+                async for row in query_images(src_conn, args.source_table, args.where, args.limit):
+                    await rows.put(row)
+                for _ in workers:
+                    await rows.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+    return stats
 
 
 def main() -> None:
     args = parse_args()
     ensure_prereqs(args)
 
-    save_root = abs_scripts_path(args.save_dir)
-    print(f"Download dir: {save_root}")
+    save_root = abs_scripts_path(args.save_dir) if args.skip_download else None
+    if save_root:
+        print(f"Local image dir: {save_root}")
     print(f"Fetch prefix: {args.fetch_prefix}")
     if args.upload_prefix:
         print(f"Upload prefix: {args.upload_prefix}")
     else:
         print(f"Upload URL template: {args.upload_url}")
+    print(f"Concurrency: download {args.download_concurrency} | upload {args.upload_concurrency}")
 
-    total = 0
-    downloaded = 0
-    uploaded = 0
-    skipped_download = 0
-
-    with psycopg.connect(args.source_dsn) as src_conn:
-        for row in query_images(src_conn, args.source_table, args.where, args.limit):
-            total += 1
-            fetch_url = join_url(args.fetch_prefix, row.image_path)
-            local_path = os.path.join(save_root, row.image_path)
-
-            try:
-                if args.skip_download and os.path.exists(local_path):
-                    skipped_download += 1
-                else:
-                    download_image(fetch_url, local_path, args.dry_run)
-                    downloaded += 1
-
-                dest_url = resolve_upload_url(args, row.artwork_id)
-                upload_image(
-                    upload_url=dest_url,
-                    cookie=args.cookie,
-                    file_field=args.upload_field_file,
-                    file_path=local_path,
-                    is_main_field=args.upload_field_is_main,
-                    is_main=row.is_main_image,
-                    dry_run=args.dry_run,
-                )
-                uploaded += 1
-
-                if args.cleanup and not args.dry_run and os.path.exists(local_path):
-                    # Best-effort cleanup; ignore errors
-                    try:
-                        os.remove(local_path)
-                    except OSError:
-                        pass
-
-            except Exception as exc:
-                print(f"\nError processing image id={row.id} path='{row.image_path}': {exc}", file=sys.stderr)
-
-            if total % 10 == 0:
-                print(
-                    f"\rProcessed {total} | downloaded {downloaded} | skipped {skipped_download} | uploaded {uploaded}",
-                    end="",
-                    flush=True,
-                )
+    stats = asyncio.run(run(args, save_root))
+    total = stats.total
+    skipped_download = stats.skipped_download
 
     print()
     if args.dry_run:
@@ -262,7 +356,10 @@ def main() -> None:
             f"(download {total if not args.skip_download else total - skipped_download}, upload {total})."
         )
     else:
-        print(f"Done. Processed {total} images (downloaded {downloaded}, skipped {skipped_download}, uploaded {uploaded}).")
+        print(
+            f"Done. Processed {total} images "
+            f"(downloaded {stats.downloaded}, skipped {skipped_download}, uploaded {stats.uploaded})."
+        )
 
 
 if __name__ == "__main__":